@@ -1,19 +1,85 @@
-import os, json, hashlib
+import os, re, hashlib, heapq, functools, sqlite3, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from openai import OpenAI
 
 TICKERS_DEFAULT = "UVIX,UUUU,URNJ,REMX,NLR,UFO,SMR,NUKZ,OKLO,ARKVX,INNOX"
 
+# Max concurrent Finnhub requests; the connection pool is sized to match so
+# every fetch thread always has a kept-alive connection available.
+FETCH_WORKERS = 16
+# After this many consecutive failures a ticker is skipped for FETCH_BREAKER_COOLDOWN
+# seconds instead of tying up a worker in retries and backoff; after the cooldown one
+# attempt is let through, and a success closes the breaker again. Only matters to a
+# process that calls fetch_all repeatedly; the cron/worker entry points make one call.
+FETCH_MAX_FAILURES = 3
+FETCH_BREAKER_COOLDOWN = 15 * 60
+
+# Sampling temperature per mode. Daily briefings run at 0 so they are deterministic
+# and therefore safe to cache; breaking verdicts keep some variety.
+LLM_TEMPERATURE = {"daily": 0, "breaking": 0.4}
+
+# Deterministic (temperature 0) completions are cached on disk so an idempotent re-run
+# (same model, prompt and news items) doesn't pay for another OpenAI round-trip within
+# the TTL. Breaking mode has no entry: its items are marked seen before the LLM call,
+# so the same breaking payload never comes back.
+LLM_CACHE_DIR = ".llm_cache"
+LLM_CACHE_TTL = {"daily": 6 * 3600}
+
+# How many news items reach the LLM: newest K per ticker after near-duplicate
+# headlines are collapsed, capped overall. Fewer input tokens = cheaper, faster completions.
+LLM_ITEMS_PER_TICKER = 5
+LLM_MAX_ITEMS = 60
+# Headlines whose 64-bit simhashes differ in at most this many bits count as duplicates
+SIMHASH_MAX_DISTANCE = 3
+
+# Seen ids are kept at least this long (and never less than the breaking lookback)
+# so the store stays bounded instead of growing forever.
+SEEN_RETENTION_HOURS = 7 * 24
+
+# One keep-alive session shared by all fetch threads, so each ticker reuses
+# an open connection to finnhub.io instead of paying a fresh TCP+TLS handshake.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=FETCH_WORKERS,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+))
+# Consecutive fetch failures and time of the last one, per ticker;
+# only touched from the thread driving fetch_all
+_fail_counts = Counter()
+_last_failure = {}
+
 def env(name, default=None, required=False):
     v = os.getenv(name, default)
     if required and (v is None or str(v).strip() == ""):
         raise RuntimeError(f"Missing env var: {name}")
     return v
 
+# Common punctuation mapped to ASCII equivalents before dropping the rest
+_ASCII_MAP = str.maketrans({
+    "—": "-",
+    "–": "-",
+    "“": '"',
+    "”": '"',
+    "’": "'",
+    "\u00a0": " ",
+})
+
 def ascii_safe(s: str) -> str:
     """
     SendGrid (or underlying libs) can sometimes choke on certain unicode characters.
@@ -21,69 +87,214 @@ def ascii_safe(s: str) -> str:
     """
     if s is None:
         return ""
-    # Normalize a few common punctuation marks first
-    s = (str(s)
-         .replace("—", "-")
-         .replace("–", "-")
-         .replace("“", '"')
-         .replace("”", '"')
-         .replace("’", "'")
-         .replace("\u00a0", " "))
-    # Drop any remaining non-ascii
-    return s.encode("ascii", errors="ignore").decode("ascii")
-
-def finnhub_news(api_key, symbol, lookback_hours=24):
-    to_dt = datetime.now(timezone.utc)
-    from_dt = to_dt - timedelta(hours=lookback_hours)
+    s = str(s)
+    if s.isascii():
+        return s
+    # Normalize a few common punctuation marks in one pass, then drop any remaining non-ascii
+    return s.translate(_ASCII_MAP).encode("ascii", errors="ignore").decode("ascii")
 
+def finnhub_news(api_key, symbol, from_date, to_date, from_epoch):
+    """
+    News for one symbol between the from_date/to_date query strings (YYYY-MM-DD),
+    keeping only items published at or after from_epoch (UNIX seconds).
+    """
     url = "https://finnhub.io/api/v1/company-news"
     params = {
         "symbol": symbol,
-        "from": from_dt.date().isoformat(),
-        "to": to_dt.date().isoformat(),
+        "from": from_date,
+        "to": to_date,
         "token": api_key
     }
-    r = requests.get(url, params=params, timeout=30)
+    r = _SESSION.get(url, params=params, timeout=30)
     r.raise_for_status()
-    items = r.json()
+    items = orjson.loads(r.content)
 
+    # Finnhub timestamps are epoch seconds; compare them directly and only build datetimes for kept items.
+    # Text fields can come back as null; normalize them so downstream code can rely on str.
     filtered = []
     for it in items:
-        dt = datetime.fromtimestamp(it.get("datetime", 0), tz=timezone.utc)
-        if dt >= from_dt:
+        ts = it.get("datetime", 0)
+        if ts >= from_epoch:
             filtered.append({
                 "symbol": symbol,
-                "headline": it.get("headline", ""),
-                "summary": it.get("summary", ""),
-                "source": it.get("source", ""),
-                "url": it.get("url", ""),
-                "datetime": dt.isoformat(),
-                "category": it.get("category", "")
+                "headline": it.get("headline") or "",
+                "summary": it.get("summary") or "",
+                "source": it.get("source") or "",
+                "url": it.get("url") or "",
+                "datetime": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+                "category": it.get("category") or ""
             })
     return filtered
 
-def load_seen(path="seen.json"):
+def _error_item(symbol, message, dt):
+    return {
+        "symbol": symbol,
+        "headline": f"[Data error fetching news for {symbol}]",
+        "summary": message,
+        "source": "system",
+        "url": "",
+        "datetime": dt.isoformat(),
+        "category": "error"
+    }
+
+def fetch_all(api_key, tickers, lookback_hours=24, include_errors=True):
+    """
+    Fetch news for every ticker concurrently (the work is purely I/O-bound).
+    Failed tickers become a single error item, or are skipped if include_errors is False.
+    Tickers that keep failing in this process are skipped without a request until
+    their cooldown has passed.
+    """
+    all_items = []
+
+    # One window for the whole batch, so every ticker queries exactly the same range
+    to_dt = datetime.now(timezone.utc)
+    from_dt = to_dt - timedelta(hours=lookback_hours)
+    window = (from_dt.date().isoformat(), to_dt.date().isoformat(), from_dt.timestamp())
+
+    now = time.monotonic()
+    live = []
+    for t in tickers:
+        if _fail_counts[t] >= FETCH_MAX_FAILURES and now - _last_failure[t] < FETCH_BREAKER_COOLDOWN:
+            if include_errors:
+                all_items.append(_error_item(t, f"Skipped after {_fail_counts[t]} consecutive failures", to_dt))
+        else:
+            live.append(t)
+    if not live:
+        return all_items
+
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(live))) as ex:
+        futures = {ex.submit(finnhub_news, api_key, t, *window): t for t in live}
+        for fut in as_completed(futures):
+            t = futures[fut]
+            try:
+                all_items.extend(fut.result())
+                _fail_counts[t] = 0
+            except Exception as e:
+                _fail_counts[t] += 1
+                _last_failure[t] = time.monotonic()
+                if include_errors:
+                    all_items.append(_error_item(t, str(e), to_dt))
+    return all_items
+
+def load_seen(path="seen.db"):
+    """
+    Open the SQLite store of already-alerted item ids.
+    Lookups hit the primary key index and new ids are appended via the WAL,
+    so nothing is re-serialized as the set grows.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "PRAGMA auto_vacuum=INCREMENTAL;"
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "CREATE TABLE IF NOT EXISTS seen(id TEXT PRIMARY KEY, seen_at INTEGER NOT NULL) WITHOUT ROWID;"
+    )
+    return conn
+
+def seen_ids(conn, ids, batch=500):
+    """Return the subset of ids already stored, checking them in batched IN (...) queries."""
+    ids = list(ids)
+    found = set()
+    for i in range(0, len(ids), batch):
+        chunk = ids[i:i + batch]
+        marks = ",".join("?" * len(chunk))
+        found.update(r[0] for r in conn.execute(f"SELECT id FROM seen WHERE id IN ({marks})", chunk))
+    return found
+
+def mark_seen(conn, ids):
+    now = int(time.time())
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO seen VALUES(?, ?)", ((i, now) for i in ids))
+
+def prune_seen(conn, max_age_hours):
+    """
+    Forget ids recorded more than max_age_hours ago and release the freed pages.
+    Safe as long as max_age_hours covers the fetch lookback: older items never come back.
+    """
+    cutoff = int(time.time()) - int(max_age_hours * 3600)
+    with conn:
+        conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,))
+    # incremental_vacuum frees one page per step; executescript runs it to completion
+    conn.executescript("PRAGMA incremental_vacuum;")
+
+_ID_FIELDS = ("symbol", "headline", "datetime", "url")
+
+def item_id(item):
+    raw = b"|".join(item.get(k, "").encode("utf-8") for k in _ID_FIELDS)
+    # Dedup key only, so a 128-bit BLAKE2b digest is plenty and cheaper than SHA-256
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def headline_simhash(headline):
+    """
+    64-bit simhash over character 3-gram shingles of the normalized headline,
+    or None when nothing is left after normalizing (no basis for comparison).
+    Memoized, so the prompt dedup and the briefing skip don't hash the same headline twice.
+    """
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", (headline or "").lower()).split())
+    if not text:
+        return None
+    shingles = {text[i:i + 3] for i in range(max(1, len(text) - 2))}
+    # One 64-char bit string per shingle hash; zip(*) turns them into per-bit columns,
+    # so the majority vote is 64 C-level counts instead of a Python loop per shingle bit.
+    rows = [
+        format(int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for sh in shingles
+    ]
+    half = len(rows) / 2
+    return int("".join("1" if col.count("1") > half else "0" for col in zip(*rows)), 2)
+
+def is_near_duplicate(fp, fps, max_distance=SIMHASH_MAX_DISTANCE):
+    if fp is None:
+        return False
+    return any((fp ^ other).bit_count() <= max_distance for other in fps)
+
+def dedup_by_headline(items):
+    """Drop items whose headline is a near-duplicate of an earlier one, keeping the earliest."""
+    kept, fps = [], []
+    for it in sorted(items, key=itemgetter("datetime")):
+        fp = headline_simhash(it.get("headline", ""))
+        if not is_near_duplicate(fp, fps):
+            kept.append(it)
+            if fp is not None:
+                fps.append(fp)
+    return kept
+
+def select_for_llm(news_items, per_ticker=LLM_ITEMS_PER_TICKER, limit=LLM_MAX_ITEMS):
+    """Newest `per_ticker` deduplicated items for each ticker, newest first, at most `limit` in total."""
+    by_ticker = {}
+    for it in news_items:
+        by_ticker.setdefault(it.get("symbol", ""), []).append(it)
+
+    selected = []
+    for items in by_ticker.values():
+        selected.extend(heapq.nlargest(per_ticker, dedup_by_headline(items), key=itemgetter("datetime")))
+    # Fully deterministic order (fetch completion order varies run to run) keeps the prompt stable
+    selected.sort(key=itemgetter("datetime", "url", "symbol"), reverse=True)
+    return selected[:limit]
+
+def load_fingerprints(path="last_briefing_fingerprints.json"):
     try:
-        with open(path, "r") as f:
-            return set(json.load(f))
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except Exception:
-        return set()
+        return []
 
-def save_seen(seen, path="seen.json"):
-    with open(path, "w") as f:
-        json.dump(sorted(list(seen)), f)
+def save_fingerprints(fps, path="last_briefing_fingerprints.json"):
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(fps))
 
-def item_id(item):
-    raw = (
-        item.get("symbol","") + "|" +
-        item.get("headline","") + "|" +
-        item.get("datetime","") + "|" +
-        item.get("url","")
-    )
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+# One client per API key for the life of the process, so repeated calls share setup
+@functools.lru_cache(maxsize=1)
+def _openai(api_key):
+    return OpenAI(api_key=api_key)
+
+@functools.lru_cache(maxsize=1)
+def _sendgrid(api_key):
+    return SendGridAPIClient(api_key)
 
 def send_email(sendgrid_key, from_email, to_email, subject, content):
-    sg = SendGridAPIClient(sendgrid_key)
+    sg = _sendgrid(sendgrid_key)
 
     # Make the email robust against unicode encoding issues
     subject = ascii_safe(subject)
@@ -97,55 +308,130 @@ def send_email(sendgrid_key, from_email, to_email, subject, content):
     )
     sg.send(message)
 
-def llm_analyze(openai_key, model, tickers, news_items, mode="daily"):
-    client = OpenAI(api_key=openai_key)
-
-    # Keep payload reasonable
-    compact = news_items[:80]
-
-    system = (
-        "You are a portfolio intelligence analyst. You are advice-only. "
-        "You monitor the user's tickers and produce actionable, non-hyped analysis. "
-        "You think outside the box: second-order effects, correlations, regulation, supply chain, dilution risk, "
-        "short interest dynamics, ETF structure risks, and macro sensitivity. "
-        "Be explicit about uncertainty and what would change your view. "
-        "Do not fabricate events; use only the provided news items."
-    )
+def _cache_key(model, system, user_content):
+    raw = orjson.dumps({"m": model, "s": system, "u": user_content}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(raw).hexdigest()
 
-    if mode == "daily":
-        user_obj = {
-            "task": "Create a daily briefing for the user's tickers based ONLY on the news_items provided.",
-            "requirements": [
-                "Group by ticker; include 0–3 bullets each; skip tickers with no meaningful items.",
-                "Add an 'Outside-the-box insights' section connecting tickers/themes.",
-                "Add 'Recommendations (advice-only)' per ticker: Hold/Add/Trim/Avoid + 1–2 sentence rationale.",
-                "Add a 'Watch next' checklist (earnings, filings, catalysts).",
-                "Keep it concise and skimmable."
-            ],
-            "tickers": tickers,
-            "news_items": compact
-        }
-    else:
-        user_obj = {
-            "task": "Decide whether this is important enough to alert the user now (advice-only). Use ONLY the news_items provided.",
-            "requirements": [
-                "Score severity 0-100 (100 = immediate action).",
-                "If severity < 70, say 'NO ALERT' and give a 2 sentence rationale.",
-                "If severity >= 70, say 'ALERT' and provide: what happened, why it matters, what to do next (advice-only)."
-            ],
-            "tickers": tickers,
-            "news_items": compact
-        }
-
-    resp = client.chat.completions.create(
+def cache_get(key, ttl, cache_dir=LLM_CACHE_DIR):
+    path = os.path.join(cache_dir, key + ".json")
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            os.remove(path)
+            return None
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())["content"]
+    except Exception:
+        return None
+
+def cache_put(key, content, cache_dir=LLM_CACHE_DIR, max_age=max(LLM_CACHE_TTL.values())):
+    """Store a completion and drop entries older than any TTL, so the cache stays bounded."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cutoff = time.time() - max_age
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        with open(os.path.join(cache_dir, key + ".json"), "wb") as f:
+            f.write(orjson.dumps({"content": content}))
+    except Exception:
+        pass
+
+_SYSTEM_PROMPT = (
+    "You are a portfolio intelligence analyst. You are advice-only. "
+    "You monitor the user's tickers and produce actionable, non-hyped analysis. "
+    "You think outside the box: second-order effects, correlations, regulation, supply chain, dilution risk, "
+    "short interest dynamics, ETF structure risks, and macro sensitivity. "
+    "Be explicit about uncertainty and what would change your view. "
+    "Do not fabricate events; use only the provided news items."
+)
+
+# The static task/requirements for each mode, serialized once at import with the
+# closing brace dropped. Per-run tickers and news_items are spliced on the end, so
+# every prompt starts with the same bytes (provider-side prompt caching).
+_USER_PREFIX = {
+    "daily": orjson.dumps({
+        "task": "Create a daily briefing for the user's tickers based ONLY on the news_items provided.",
+        "requirements": [
+            "Group by ticker; include 0–3 bullets each; skip tickers with no meaningful items.",
+            "Add an 'Outside-the-box insights' section connecting tickers/themes.",
+            "Add 'Recommendations (advice-only)' per ticker: Hold/Add/Trim/Avoid + 1–2 sentence rationale.",
+            "Add a 'Watch next' checklist (earnings, filings, catalysts).",
+            "Keep it concise and skimmable."
+        ]
+    })[:-1],
+    "breaking": orjson.dumps({
+        "task": "Decide whether this is important enough to alert the user now (advice-only). Use ONLY the news_items provided.",
+        "requirements": [
+            "Score severity 0-100 (100 = immediate action).",
+            "If severity < 70, say 'NO ALERT' and give a 2 sentence rationale.",
+            "If severity >= 70, say 'ALERT' and provide: what happened, why it matters, what to do next (advice-only)."
+        ]
+    })[:-1],
+}
+
+# The breaking-mode verdict is whichever of these appears first in the answer
+_VERDICT_RE = re.compile(r"\b(NO ALERT|ALERT)\b")
+
+def alert_verdict(text):
+    """Return "NO ALERT", "ALERT", or None if the answer states neither."""
+    m = _VERDICT_RE.search(text or "")
+    return m.group(1) if m else None
+
+def llm_analyze(openai_key, model, tickers, news_items, mode="daily"):
+    # Keep payload reasonable: dedup near-identical headlines, newest few per ticker
+    compact = select_for_llm(news_items)
+
+    prefix = _USER_PREFIX["daily" if mode == "daily" else "breaking"]
+    user_content = (
+        prefix
+        + b',"tickers":' + orjson.dumps(sorted(tickers))
+        + b',"news_items":' + orjson.dumps(compact)
+        + b"}"
+    ).decode("utf-8")
+
+    temperature = LLM_TEMPERATURE.get(mode, LLM_TEMPERATURE["breaking"])
+    # Only deterministic completions are cached; a sampled answer isn't "the" answer
+    ttl = LLM_CACHE_TTL.get(mode) if temperature == 0 else None
+    key = _cache_key(model, _SYSTEM_PROMPT, user_content)
+    if ttl is not None:
+        cached = cache_get(key, ttl)
+        if cached is not None:
+            return cached
+
+    client = _openai(openai_key)
+    stream = client.chat.completions.create(
         model=model,
         messages=[
-            {"role":"system","content":system},
-            {"role":"user","content":json.dumps(user_obj)}
+            {"role":"system","content":_SYSTEM_PROMPT},
+            {"role":"user","content":user_content}
         ],
-        temperature=0.4
+        temperature=temperature,
+        stream=True
     )
-    return resp.choices[0].message.content
+    parts = []
+    decided = mode != "breaking"
+    truncated = False
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        parts.append(chunk.choices[0].delta.content or "")
+        if decided or len(parts) > 50:
+            continue
+        # A breaking-mode NO ALERT verdict is never sent, so don't wait for its rationale.
+        # Only trust a match that isn't at the very end (the next chunk could extend it).
+        text = "".join(parts)
+        m = _VERDICT_RE.search(text)
+        if m and m.end() < len(text):
+            decided = True
+            if m.group(1) == "NO ALERT":
+                stream.close()
+                truncated = True
+                break
+    content = "".join(parts)
+    # A cut-off answer is only good for the verdict; never cache it as a full completion
+    if ttl is not None and not truncated:
+        cache_put(key, content)
+    return content
 
 def run_daily():
     finnhub_key = env("FINNHUB_API_KEY", required=True)
@@ -158,22 +444,8 @@ def run_daily():
     tickers = [t.strip().upper() for t in env("TICKERS", TICKERS_DEFAULT).split(",") if t.strip()]
     lookback_hours = int(env("LOOKBACK_HOURS_DAILY", "24"))
 
-    all_items = []
-    for t in tickers:
-        try:
-            all_items.extend(finnhub_news(finnhub_key, t, lookback_hours=lookback_hours))
-        except Exception as e:
-            all_items.append({
-                "symbol": t,
-                "headline": f"[Data error fetching news for {t}]",
-                "summary": str(e),
-                "source": "system",
-                "url": "",
-                "datetime": datetime.now(timezone.utc).isoformat(),
-                "category": "error"
-            })
-
-    all_items.sort(key=lambda x: x.get("datetime",""), reverse=True)
+    all_items = fetch_all(finnhub_key, tickers, lookback_hours=lookback_hours)
+    all_items.sort(key=itemgetter("datetime"), reverse=True)
 
     content = llm_analyze(openai_key, openai_model, tickers, all_items, mode="daily")
     subject = f"Daily Portfolio Briefing - {datetime.now().strftime('%Y-%m-%d')}"
@@ -190,34 +462,48 @@ def run_breaking():
     tickers = [t.strip().upper() for t in env("TICKERS", TICKERS_DEFAULT).split(",") if t.strip()]
     lookback_hours = int(env("LOOKBACK_HOURS_BREAKING", "6"))
 
-    seen = load_seen("seen.json")
+    seen = load_seen("seen.db")
+
+    items = fetch_all(finnhub_key, tickers, lookback_hours=lookback_hours, include_errors=False)
+    ids = [item_id(it) for it in items]
+    skip = seen_ids(seen, ids)
 
     new_items = []
-    for t in tickers:
-        try:
-            items = finnhub_news(finnhub_key, t, lookback_hours=lookback_hours)
-            for it in items:
-                iid = item_id(it)
-                if iid not in seen:
-                    new_items.append(it)
-                    seen.add(iid)
-        except Exception:
-            continue
+    new_ids = set()
+    for it, iid in zip(items, ids):
+        if iid not in skip and iid not in new_ids:
+            new_items.append(it)
+            new_ids.add(iid)
 
-    save_seen(seen, "seen.json")
+    mark_seen(seen, new_ids)
+    prune_seen(seen, max(SEEN_RETENTION_HOURS, lookback_hours))
+    seen.close()
 
     if not new_items:
         return
 
-    new_items.sort(key=lambda x: x.get("datetime",""), reverse=True)
-    content = llm_analyze(openai_key, openai_model, tickers, new_items, mode="breaking")
+    # Syndicated copies of stories already briefed get new ids; drop those and only
+    # brief what's left. Items without a usable headline always count as new.
+    fps = [headline_simhash(it.get("headline", "")) for it in new_items]
+    last_fps = load_fingerprints("last_briefing_fingerprints.json")
+    fresh = [it for it, fp in zip(new_items, fps) if not is_near_duplicate(fp, last_fps)]
+    if not fresh:
+        return
+    # Remember the copies too, so a later copy of an already briefed story is still caught
+    known_fps = [fp for fp in fps if fp is not None]
+
+    fresh.sort(key=itemgetter("datetime"), reverse=True)
+    content = llm_analyze(openai_key, openai_model, tickers, fresh, mode="breaking")
 
-    # If LLM says no alert, do nothing.
-    if "NO ALERT" in content and "ALERT" not in content:
+    # Only record the briefing once it has been handled (judged NO ALERT or delivered),
+    # so a failed LLM call or send doesn't suppress the next run's copies of these stories.
+    if alert_verdict(content) == "NO ALERT":
+        save_fingerprints(known_fps, "last_briefing_fingerprints.json")
         return
 
     subject = f"Portfolio Alert - {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}"
     send_email(sendgrid_key, from_email, to_email, subject, content)
+    save_fingerprints(known_fps, "last_briefing_fingerprints.json")
 
 if __name__ == "__main__":
     mode = env("MODE", "daily").lower().strip()